@@ -1,20 +1,39 @@
 import sys
 import argparse
-import nltk
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import wordnet
+import csv
+import spacy
 from num2words import num2words
 import yoda
 import json
 import os
 import re
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
-# --- NLTK SETUP (Run once) ---
-# nltk.download('punkt')
-# nltk.download('averaged_percept1ron_tagger')
-# nltk.download('wordnet')
-# nltk.download('omw-1.4')
-# nltk.download('punkt_tab')
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# --- SPACY SETUP (Run once) ---
+# python -m spacy download en_core_web_lg
+
+# WordNet POS constants (same values as nltk.corpus.wordnet.ADJ etc.), kept
+# literal so the hot path never touches the NLTK corpus loader.
+WN_ADJ = 'a'
+WN_VERB = 'v'
+WN_NOUN = 'n'
+WN_ADV = 'r'
+
+_NUM_RE = re.compile(r"\d+")
+_CONVO_RE = re.compile(r"'((?:\\'|[^'])*)'")
+
+
+@functools.lru_cache(maxsize=4096)
+def _number_to_words(n):
+    """num2words is pure Python and slow; small numbers repeat constantly."""
+    return num2words(n)
 
 """Translator for conlang_lexicon.json.
 
@@ -26,22 +45,43 @@ Lexicon values can be either:
 class ConlangTranslator:
     """English -> conlang translator using a WordNet-style keyed lexicon."""
 
-    def __init__(self, lexicon):
+    def __init__(self, lexicon, nlp=None):
         self.lexicon = lexicon
-        self.lemmatizer = WordNetLemmatizer()
+        # One pipeline reused across calls: tokenizer + tagger + lemmatizer.
+        self._nlp = nlp if nlp is not None else self.load_pipeline()
+        # (lemma, wn_pos) -> lexicon key (or None); words repeat a lot in convos
+        self._key_cache = {}
+        self._prefix_index = self._build_prefix_index(lexicon)
+
+    @staticmethod
+    def _build_prefix_index(lexicon):
+        """Map every dot-terminated key prefix ("run.", "run.v.") to the
+        first lexicon key (in file order) that starts with it."""
+        index = {}
+        for key in lexicon:
+            dot = key.find('.')
+            while dot != -1:
+                index.setdefault(key[:dot + 1], key)
+                dot = key.find('.', dot + 1)
+        return index
+
+    @staticmethod
+    def load_pipeline():
+        """Load the spaCy pipeline used for tokenizing, tagging and lemmas."""
+        return spacy.load("en_core_web_lg", disable=["parser", "ner"])
 
     @staticmethod
     def get_wordnet_pos(treebank_tag):
-        """Map NLTK POS tags to WordNet POS tags."""
+        """Map Penn Treebank POS tags to WordNet POS tags."""
         if treebank_tag.startswith('J'):
-            return wordnet.ADJ
+            return WN_ADJ
         if treebank_tag.startswith('V'):
-            return wordnet.VERB
+            return WN_VERB
         if treebank_tag.startswith('N'):
-            return wordnet.NOUN
+            return WN_NOUN
         if treebank_tag.startswith('R'):
-            return wordnet.ADV
-        return wordnet.NOUN
+            return WN_ADV
+        return WN_NOUN
 
     @staticmethod
     def entry_to_word(entry, fallback):
@@ -53,38 +93,53 @@ class ConlangTranslator:
         return fallback
 
     def find_best_key(self, lemma, wn_pos):
-        """Find the best matching key in the lexicon for lemma/POS."""
+        """Find the best matching key in the lexicon for lemma/POS (cached)."""
+        cache_key = (lemma, wn_pos)
+        try:
+            return self._key_cache[cache_key]
+        except KeyError:
+            pass
+        key = self._lookup_key(lemma, wn_pos)
+        self._key_cache[cache_key] = key
+        return key
+
+    def _lookup_key(self, lemma, wn_pos):
+        """Uncached lemma/POS -> lexicon key resolution."""
         # Priority 1: Exact Match (lemma + pos + .01)
         candidate_01 = f"{lemma}.{wn_pos}.01"
         if candidate_01 in self.lexicon:
             return candidate_01
 
         # Priority 2: Fuzzy Match (lemma + pos)
-        prefix = f"{lemma}.{wn_pos}."
-        for key in self.lexicon:
-            if key.startswith(prefix):
-                return key
+        key = self._prefix_index.get(f"{lemma}.{wn_pos}.")
+        if key is not None:
+            return key
 
         # Priority 3: Desperation Match (lemma only)
-        prefix = f"{lemma}."
-        for key in self.lexicon:
-            if key.startswith(prefix):
-                return key
+        return self._prefix_index.get(f"{lemma}.")
 
-        return None
+    @staticmethod
+    def _prepare_sentence(sentence):
+        """Spell out digits and split hyphenated words before tokenizing."""
+        sentence = _NUM_RE.sub(lambda x: _number_to_words(int(x.group(0))), sentence)
+        return sentence.replace("-"," ")
 
     def translate_sentence(self, sentence):
         """Translate a sentence; unknown words are output as [word]."""
-        sentence = re.sub(r"\d+", lambda x: num2words(int(x.group(0))  ), sentence)
-        sentence = sentence.replace("-"," ")
-        
-        
-        tokens = nltk.word_tokenize(sentence)
-        tagged = nltk.pos_tag(tokens)
+        return self._translate_doc(self._nlp(self._prepare_sentence(sentence)))
 
-        def translate_token(word, tag):
-            wn_pos = self.get_wordnet_pos(tag)
-            lemma = self.lemmatizer.lemmatize(word.lower(), pos=wn_pos)
+    def translate_many(self, sentences, batch_size=64):
+        """Translate an iterable of sentences, yielding results in order."""
+        texts = (self._prepare_sentence(s) for s in sentences)
+        for doc in self._nlp.pipe(texts, batch_size=batch_size, n_process=1):
+            yield self._translate_doc(doc)
+
+    def _translate_doc(self, doc):
+        """Translate an already-tagged spaCy Doc."""
+        def translate_token(tok):
+            word = tok.text
+            wn_pos = self.get_wordnet_pos(tok.tag_)
+            lemma = tok.lemma_.lower()
 
             target_key = self.find_best_key(lemma, wn_pos)
             if target_key and target_key in self.lexicon:
@@ -93,25 +148,30 @@ class ConlangTranslator:
 
         translation = []
         i = 0
-        while i < len(tagged):
-            word, tag = tagged[i]
+        while i < len(doc):
+            tok = doc[i]
+
+            # Skip whitespace tokens spaCy keeps for runs of spaces
+            if tok.is_space:
+                i += 1
+                continue
 
             # Pass through punctuation
-            if not word.isalnum():
-                translation.append(word)
+            if not tok.text.isalnum():
+                translation.append(tok.text)
                 i += 1
                 continue
 
             # Flip participle-before-noun pairs: "running man" -> "man running"
-            if tag in {'VBG', 'VBN'} and i + 1 < len(tagged):
-                next_word, next_tag = tagged[i + 1]
-                if next_word.isalnum() and next_tag.startswith('NN'):
-                    translation.append(translate_token(next_word, next_tag))
-                    translation.append(translate_token(word, tag))
+            if tok.tag_ in {'VBG', 'VBN'} and i + 1 < len(doc):
+                next_tok = doc[i + 1]
+                if next_tok.text.isalnum() and next_tok.tag_.startswith('NN'):
+                    translation.append(translate_token(next_tok))
+                    translation.append(translate_token(tok))
                     i += 2
                     continue
 
-            translation.append(translate_token(word, tag))
+            translation.append(translate_token(tok))
             i += 1
 
         return " ".join(translation)
@@ -119,9 +179,13 @@ class ConlangTranslator:
     @classmethod
     def from_json(cls, filename):
         """Load a lexicon JSON file and return a translator."""
-        with open(filename, 'r', encoding='utf-8') as f:
-            lexicon = json.load(f)
-        return cls(lexicon)
+        return cls(_read_lexicon(filename))
+
+
+def _read_lexicon(filename):
+    # Parse raw bytes: orjson (when installed) is several times faster
+    with open(filename, 'rb') as f:
+        return _json_loads(f.read())
 
 
 def _configure_utf8_stdout():
@@ -134,8 +198,13 @@ def _configure_utf8_stdout():
 def _load_translator(lexicon_path):
     if not os.path.exists(lexicon_path):
         raise FileNotFoundError(lexicon_path)
-    translator = ConlangTranslator.from_json(lexicon_path)
-    return translator
+    # Read and parse the lexicon on a worker thread while the spaCy model
+    # loads; both are dominated by disk reads that release the GIL
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(_read_lexicon, lexicon_path)
+        nlp = ConlangTranslator.load_pipeline()
+        lexicon = pending.result()
+    return ConlangTranslator(lexicon, nlp=nlp)
 
 
 def _detect_convo_path(base_dir):
@@ -146,11 +215,22 @@ def _detect_convo_path(base_dir):
     return None
 
 
-def _read_convo_sentences(convo_path):
+def _read_convo_sentences(convo_path, column=None):
+    """Read sentences from a convo file.
+
+    With a column index the file is parsed as CSV (single-quoted fields,
+    backslash escapes); otherwise the first quoted string on each line is used.
+    """
+    if column is not None:
+        with open(convo_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f, quotechar="'", escapechar='\\', skipinitialspace=True)
+            return [row[column].strip() for row in reader
+                    if len(row) > column and row[column].strip()]
+
     with open(convo_path, 'r', encoding='utf-8') as f:
         sentences = []
         for line in f:
-            match = re.search(r"'((?:\\'|[^'])*)'", line)
+            match = _CONVO_RE.search(line)
             if not match:
                 continue
             sentence = match.group(1).replace("\\'", "'").strip()
@@ -159,23 +239,18 @@ def _read_convo_sentences(convo_path):
     return sentences
 
 
-def run_auto(translator, convo_path, output_path):
-    sentences = _read_convo_sentences(convo_path)
+def run_auto(translator, convo_path, output_path, column=None):
+    sentences = _read_convo_sentences(convo_path, column)
+
+    # Multi-sentence lines were never written out, so don't translate them.
+    single = [s for s in sentences if len(s.split('.')) == 1]
 
     with open(output_path, "w", encoding="utf-8") as f:
         last = ""
         print("-" * 50)
-        for set in sentences:
+        for set, out in zip(single, translator.translate_many(single)):
             if last == set:
                 continue
-            test = set.split('.')
-            if len(test) > 1:
-                for myset in test:
-                    if last == myset:
-                        continue
-                    out = translator.translate_sentence(set)
-                continue
-            out = translator.translate_sentence(set)
             if out == last:
                 continue
             print(out)
@@ -218,6 +293,8 @@ def main():
     parser.add_argument('--mode', choices=['a', 'auto', 'i', 'interactive'])
     parser.add_argument('--lexicon', default=os.path.join(base_dir, 'conlang_lexicon.json'))
     parser.add_argument('--convo', default=None)
+    parser.add_argument('--column', type=int, default=None,
+                        help='Parse the convo file as CSV and read sentences from this column')
     parser.add_argument('--output', default=os.path.join(base_dir, 'translation'))
     parser.add_argument('--yoda', action='store_true')
     args = parser.parse_args()
@@ -248,7 +325,7 @@ def main():
         raise FileNotFoundError("No such file or directory: convo.csv (also tried convo..csv)")
 
     if args.yoda:
-        sentences = _read_convo_sentences(convo_path)
+        sentences = _read_convo_sentences(convo_path, args.column)
         with open(args.output, "w", encoding="utf-8") as f:
             last = ""
             print("-" * 50)
@@ -272,7 +349,7 @@ def main():
                 #time.sleep(1)
         return
 
-    run_auto(translator, convo_path, args.output)
+    run_auto(translator, convo_path, args.output, column=args.column)
 
 
 if __name__ == '__main__':
@@ -3,11 +3,16 @@ warnings.filterwarnings("ignore", category=UserWarning, message=".*Evaluating Do
 
 import json
 import math
+import functools
 
 import en_core_web_lg
+from tqdm import tqdm
 from nltk.corpus import wordnet as wn
 
-nlp = en_core_web_lg.load(disable=["tagger", "parser", "ner", "lemmatizer", "attribute_ruler"])
+@functools.lru_cache(maxsize=None)
+def get_nlp():
+    """Load the spaCy model on first use instead of at import time"""
+    return en_core_web_lg.load(disable=["tagger", "parser", "ner", "lemmatizer", "attribute_ruler"])
 
 
 results = {}
@@ -40,7 +45,11 @@ anchors ={
     ]
 } 
 
-ANCHOR_DOCS = {k: list(nlp.pipe(v, batch_size=64)) for k, v in anchors.items()}
+@functools.lru_cache(maxsize=None)
+def get_anchor_docs():
+    """Parse the anchor phrases once, on first use"""
+    nlp = get_nlp()
+    return {k: list(nlp.pipe(v, batch_size=64)) for k, v in anchors.items()}
 
 def log_scale(value, in_min=0.2, in_max=0.8, out_max=63):
     """Map value from [in_min, in_max] to [0, out_max] using log scale"""
@@ -69,6 +78,7 @@ def process_word(word):
     synsets = wn.synsets(word)
     if not synsets:
         return None
+    anchor_docs = get_anchor_docs()
 
     # We don't need a global 'skipword' flag or 'final_composition'
     # We process and save each valid synonym individually.
@@ -86,19 +96,20 @@ def process_word(word):
         type = name.split('.')[1]
         defn = syn.definition()
         sword = word*3
-        doc = nlp(sword+" "+defn)
+        doc = get_nlp()(sword+" "+defn)
 
         composition = { 'earth' :0,'air':0, 'water':0,'fire':0}
         closest = ""
         max_sim = 0
         for key in anchors:
-            for anchor_doc in ANCHOR_DOCS[key]:
+            for anchor_doc in anchor_docs[key]:
                 sim = doc.similarity(anchor_doc)
                 if max_sim < sim:
                     closest = key
                     max_sim = sim
-            if composition[key] < log_scale(max_sim):
-                composition[key] = log_scale(max_sim)
+            score = log_scale(max_sim)
+            if composition[key] < score:
+                composition[key] = score
         
         # Apply Bumps
         if False:
@@ -114,12 +125,7 @@ def process_word(word):
         # 2. Save IMMEDIATELY inside the loop
         data = { 'spirit': closest, 'composition': composition, 'definition': defn}
         results[name] = data
-        total = len(results.keys())
-        print(f"Processed {total} {name}                   ", end="\r")
-        
-        # Optional: Print progress per added synset if you want, 
-        # or just keep the print in the main loop to reduce spam.
-    
+
     return True
 
 def _process_word(word):
@@ -128,6 +134,7 @@ def _process_word(word):
     synsets = wn.synsets(word)
     if not synsets:
         return None
+    anchor_docs = get_anchor_docs()
 
     final_composition = None
     skipword = False
@@ -140,12 +147,12 @@ def _process_word(word):
 
         type = name.split('.')[1]
         defn = syn.definition()
-        doc = nlp(defn)
+        doc = get_nlp()(defn)
 
         composition = {}
         for key in anchors:
             max_sim = -1.0
-            for anchor_doc in ANCHOR_DOCS[key]:
+            for anchor_doc in anchor_docs[key]:
                 sim = doc.similarity(anchor_doc)
                 if sim > max_sim:
                     max_sim = sim
@@ -164,8 +171,6 @@ def _process_word(word):
         return
     data = { 'composition': final_composition, 'definition': defn}
     results[name] = data
-    total = len(results.keys())
-    print(f"Processed {total} {name}____________", end="\r")
     return data
 
 def main():
@@ -180,14 +185,14 @@ def main():
     # Process each word
     total_words = len(words)
     print(f"Processing {total_words} words...")
-    for i, word in enumerate(words, 1):
+    for word in tqdm(words):
         process_word(word)
 
     print("*"*50)
     print("")
     with open('elemental_dict.json', 'w', encoding='utf-8') as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
-        print(len(results.keys()))
+        print(len(results))
     
     
     
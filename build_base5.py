@@ -1,15 +1,15 @@
-import warnings
-# Filter specific spaCy warnings about empty vectors
-warnings.filterwarnings("ignore", category=UserWarning, message=".*Evaluating Doc.similarity based on empty vectors.*")
-
 import json
-import math
-import spacy
-import en_core_web_lg
+import functools
+import numpy as np
+from tqdm import tqdm
 from nltk.corpus import wordnet as wn
 
-# Load the large English model
-nlp = en_core_web_lg.load(disable=["tagger", "parser", "ner", "lemmatizer", "attribute_ruler"])
+# Share the model, vector and scaling helpers with the four-element builder
+# so the scoring math lives in one place
+from build_elemental_dictionary import (
+    get_nlp, anchor_layout, build_anchor_matrix, weighted_vector,
+    anchor_similarities, element_maxima, log_scale_vec,
+)
 
 results = {}
 
@@ -55,39 +55,23 @@ anchors = {
     ]
 }
 
-# Pre-compute vector docs for anchors to speed up processing
-print("Pre-computing anchor vectors...")
-ANCHOR_DOCS = {k: list(nlp.pipe(v, batch_size=64)) for k, v in anchors.items()}
-print("Vectors loaded.")
+@functools.lru_cache(maxsize=None)
+def get_anchor_matrix():
+    """Pre-compute anchor vectors on first use to speed up processing"""
+    print("Pre-computing anchor vectors...")
+    nlp = get_nlp()
+    mat = build_anchor_matrix({k: list(nlp.pipe(v, batch_size=64)) for k, v in anchors.items()},
+                              nlp.vocab.vectors.shape[1])
+    print("Vectors loaded.")
+    return mat
+
+# Element order and the first matrix row of each element's anchors
+ANCHOR_KEYS, ANCHOR_STARTS = anchor_layout(anchors)
 
 # ---------------------------------------------------------
 # 2. HELPER FUNCTIONS
 # ---------------------------------------------------------
 
-def log_scale(value, in_min=0.2, in_max=0.8, out_max=63):
-    """Map similarity value from [in_min, in_max] to [0, out_max] using log scale"""
-    if in_min <= 0 or in_max <= 0 or in_min >= in_max:
-        return 0
-    if value <= in_min:
-        return 0
-    if value >= in_max:
-        return out_max
-
-    log_min = math.log(in_min)
-    log_max = math.log(in_max)
-    denom = (log_max - log_min)
-    if denom == 0:
-        return 0
-    
-    scale = (math.log(value) - log_min) / denom
-    scaled = int(round(scale * out_max))
-    
-    if scaled < 0:
-        return 0
-    if scaled > out_max:
-        return out_max
-    return scaled
-
 def process_word(word):
     synsets = wn.synsets(word)
     if not synsets:
@@ -107,33 +91,25 @@ def process_word(word):
 
         defn = syn.definition()
         
-        # Heuristic: Weight the vector towards the word itself (3x) + definition
-        sword = word * 3
-        doc = nlp(f"{sword} {defn}")
+        # Heuristic: Weight the vector towards the word itself + definition
+        vector = weighted_vector(word, defn)
 
         # Initialize the Five Elements
         composition = {'wood': 0, 'fire': 0, 'earth': 0, 'metal': 0, 'water': 0}
-        
         closest_spirit = ""
-        global_max_sim = 0
-
-        # Compare against all anchors
-        for key in anchors:
-            local_max_sim = 0
-            for anchor_doc in ANCHOR_DOCS[key]:
-                sim = doc.similarity(anchor_doc)
-                if sim > local_max_sim:
-                    local_max_sim = sim
-            
-            # Update composition score for this element
-            score = log_scale(local_max_sim)
-            if composition[key] < score:
-                composition[key] = score
-            
+
+        # Texts with no known words score 0 everywhere; skip the sweep
+        if vector.any():
+            # Compare against all anchors in one matrix-vector product,
+            # then take the best anchor per element and scale them together
+            sims = anchor_similarities(vector, get_anchor_matrix())
+            local_max = np.maximum(element_maxima(sims, ANCHOR_STARTS), 0)
+            composition.update(zip(ANCHOR_KEYS, log_scale_vec(local_max).tolist()))
+
             # Track the dominant element across all keys
-            if local_max_sim > global_max_sim:
-                global_max_sim = local_max_sim
-                closest_spirit = key
+            best = int(local_max.argmax())
+            if local_max[best] > 0:
+                closest_spirit = ANCHOR_KEYS[best]
 
         # Construct result object
         data = {
@@ -143,8 +119,6 @@ def process_word(word):
         }
         
         results[name] = data
-        total = len(results.keys())
-        print(f"Processed {total} | {name:<30}", end="\r")
 
     return True
 
@@ -165,7 +139,7 @@ def main():
     total_words = len(words)
     print(f"Processing {total_words} words against Wu Xing (5 Elements)...")
     
-    for i, word in enumerate(words, 1):
+    for word in tqdm(words):
         process_word(word)
 
     print("\n" + "*"*50)
@@ -176,7 +150,7 @@ def main():
     with open(output_filename, 'w', encoding='utf-8') as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
         
-    print(f"Saved {len(results.keys())} entries to {output_filename}")
+    print(f"Saved {len(results)} entries to {output_filename}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,24 +1,22 @@
-import warnings
-warnings.filterwarnings("ignore", category=UserWarning, message=".*Evaluating Doc.similarity based on empty vectors.*")
-
 import math
 import json
-import random
+import os
+import pickle
+import functools
+import re
 import numpy as np
 import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
-import spacy
-from collections import Counter
-from itertools import combinations
-from wordfreq import zipf_frequency, top_n_list
-from gensim.models import Word2Vec
-from sklearn.metrics.pairwise import cosine_similarity
-import nltk
 from nltk.corpus import wordnet as wn
-from nltk.stem import WordNetLemmatizer
 
 import en_core_web_lg
-nlp = en_core_web_lg.load(disable=["tagger", "parser", "ner", "lemmatizer", "attribute_ruler"])
+
+@functools.lru_cache(maxsize=None)
+def get_nlp():
+    """Load the spaCy model on first use instead of at import time"""
+    return en_core_web_lg.load(disable=["tagger", "parser", "ner", "lemmatizer", "attribute_ruler"])
 
 results = {}
 # 2. PHONETIC MAPPING (Base-4 Conlang)
@@ -50,32 +48,131 @@ anchors ={
     ]
 } 
 
-# Parse command line arguments for custom anchors file
-parser = argparse.ArgumentParser(description='Build elemental dictionary with optional custom anchors')
-parser.add_argument('--anchor', type=str, help='JSON file containing custom anchors dictionary')
-parser.add_argument('--output', default="elemental_source.json", help="Output file name")
-parser.add_argument('--words', default="words.txt", help="Spelling dictionary ")
-args, unknown = parser.parse_known_args()
+# Every worker holds its own copy of the model vectors (several hundred MB),
+# so cap the default pool instead of using every core
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)
+
+def parse_args():
+    # Parse command line arguments for custom anchors file
+    parser = argparse.ArgumentParser(description='Build elemental dictionary with optional custom anchors')
+    parser.add_argument('--anchor', type=str, help='JSON file containing custom anchors dictionary')
+    parser.add_argument('--output', default="elemental_source.json", help="Output file name")
+    parser.add_argument('--words', default="words.txt", help="Spelling dictionary ")
+    parser.add_argument('--wn-index', default="wn_index.pkl", help="Packed WordNet index from build_wn_index.py")
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS,
+                        help=f"Worker processes, each loading its own model (default: {DEFAULT_JOBS}, 1 = no pool)")
+    args, unknown = parser.parse_known_args()
+    return args
 
-# Load custom anchors if provided, otherwise use default
-if args.anchor:
+def load_anchors(path):
+    """Load custom anchors if provided, otherwise return the defaults"""
+    if not path:
+        print("Using default anchors")
+        return anchors
     try:
-        with open(args.anchor, 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             custom_anchors = json.load(f)
         # Validate that it's a proper anchors dictionary
         if isinstance(custom_anchors, dict) and all(isinstance(v, list) for v in custom_anchors.values()):
-            anchors = custom_anchors
-            print(f"Loaded custom anchors from {args.anchor}")
-        else:
-            print(f"Invalid anchors format in {args.anchor}, using default anchors")
+            print(f"Loaded custom anchors from {path}")
+            return custom_anchors
+        print(f"Invalid anchors format in {path}, using default anchors")
     except FileNotFoundError:
-        print(f"Anchor file {args.anchor} not found, using default anchors")
+        print(f"Anchor file {path} not found, using default anchors")
     except json.JSONDecodeError as e:
-        print(f"Error parsing anchors file {args.anchor}: {e}, using default anchors")
-else:
-    print("Using default anchors")
+        print(f"Error parsing anchors file {path}: {e}, using default anchors")
+    return anchors
+
+def anchor_layout(anchor_dict):
+    """Element order and the first matrix row of each element's anchors"""
+    keys = list(anchor_dict)
+    sizes = np.array([len(v) for v in anchor_dict.values()], dtype=np.intp)
+    return keys, np.cumsum(sizes) - sizes
+
+def element_maxima(sims, starts):
+    """Best similarity per element; -inf for elements with no anchors"""
+    key_max = np.full(len(starts), -np.inf, dtype=np.float32)
+    # reduceat misreads repeated or out-of-range starts, so only reduce the
+    # elements that own rows; each slice then runs to the next such start
+    filled = np.diff(starts, append=len(sims)) > 0
+    if filled.any():
+        key_max[filled] = np.maximum.reduceat(sims, starts[filled])
+    return key_max
+
+def build_anchor_matrix(anchor_docs, width):
+    """Stack anchor vectors into one L2-normalized matrix, element by element
+
+    width is the vector size, used for the empty matrix when no element has anchors.
+    """
+    rows = [d.vector for docs in anchor_docs.values() for d in docs]
+    if not rows:
+        return np.zeros((0, width), dtype=np.float32)
+    mat = np.stack(rows).astype(np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return mat / norms
+
+@functools.lru_cache(maxsize=None)
+def get_anchor_matrix():
+    """Anchor matrix for the configured anchors, built on first use"""
+    nlp = get_nlp()
+    return build_anchor_matrix({k: list(nlp.pipe(v, batch_size=64)) for k, v in anchors.items()},
+                               nlp.vocab.vectors.shape[1])
+
+ANCHOR_KEYS, ANCHOR_STARTS = anchor_layout(anchors)
+WN_INDEX = {}
+
+def configure(anchor_dict, wn_index_path):
+    """Install the anchors and WordNet index; also the worker initializer"""
+    global anchors, ANCHOR_KEYS, ANCHOR_STARTS, WN_INDEX
+    anchors = anchor_dict
+    ANCHOR_KEYS, ANCHOR_STARTS = anchor_layout(anchors)
+    get_anchor_matrix.cache_clear()
+    # Words missing from the index fall back to NLTK, so a stale index is safe
+    WN_INDEX = load_wn_index(wn_index_path)
+
+# Direct vocab-vector access: similarity only needs the mean token vector,
+# so skip the spaCy pipeline and average rows straight out of the table
+_TOKEN_RE = re.compile(r"[A-Za-z']+")
 
-ANCHOR_DOCS = {k: list(nlp.pipe(v, batch_size=64)) for k, v in anchors.items()}
+@functools.lru_cache(maxsize=20000)
+def text_vector(text):
+    """Mean vocab vector of the words in text, memoized for repeated inputs"""
+    vocab = get_nlp().vocab
+    key2row = vocab.vectors.key2row
+    data = vocab.vectors.data
+    rows = [key2row.get(vocab.strings[tok]) for tok in _TOKEN_RE.findall(text.lower())]
+    rows = [r for r in rows if r is not None]
+    if not rows:
+        return np.zeros(data.shape[1], dtype=np.float32)
+    return data[rows].mean(axis=0)
+
+# The headword used to be weighted by repeating it in the text; blend the
+# unit-length word and definition vectors explicitly instead
+WORD_WEIGHT = 0.75
+DEFN_WEIGHT = 0.25
+
+def weighted_vector(word, defn):
+    """Weighted sum of the normalized word and definition vectors"""
+    word_vec = text_vector(word)
+    v = np.zeros_like(word_vec)
+    for part, weight in ((word_vec, WORD_WEIGHT), (text_vector(defn), DEFN_WEIGHT)):
+        norm = np.linalg.norm(part)
+        if norm:
+            v += weight * part / norm
+    return v
+
+def anchor_similarities(v, anchor_mat=None):
+    """Cosine similarity of vector v against every anchor row (0 for empty vectors)
+
+    anchor_mat defaults to this module's configured anchors.
+    """
+    if anchor_mat is None:
+        anchor_mat = get_anchor_matrix()
+    norm = np.linalg.norm(v)
+    if not norm:
+        return np.zeros(len(anchor_mat), dtype=np.float32)
+    return anchor_mat @ (v / norm)
 
 def log_scale(value, in_min=0.2, in_max=0.8, out_max=63):
     """Map value from [in_min, in_max] to [0, out_max] using log scale"""
@@ -99,51 +196,76 @@ def log_scale(value, in_min=0.2, in_max=0.8, out_max=63):
         return out_max
     return scaled
 
-def process_word(word):
-    bump = 15 
-    synsets = wn.synsets(word)
-    if not synsets:
-        return None
+LOG_IN_MIN = 0.2
+LOG_IN_MAX = 0.8
+LOG_OUT_MAX = 63
+LOG_MIN = math.log(LOG_IN_MIN)
+LOG_MAX = math.log(LOG_IN_MAX)
 
-    # We don't need a global 'skipword' flag or 'final_composition'
-    # We process and save each valid synonym individually.
-    
-    for syn in synsets:
-        name = syn.name()
+def log_scale_vec(values):
+    """Vectorized log_scale over an array using the default ranges; returns int32"""
+    logs = np.log(np.clip(np.asarray(values, dtype=np.float64), LOG_IN_MIN, LOG_IN_MAX))
+    return np.rint((logs - LOG_MIN) / (LOG_MAX - LOG_MIN) * LOG_OUT_MAX).astype(np.int32)
+
+def load_wn_index(path):
+    """Load the packed {word: [(name, definition)]} index, or {} if absent"""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return {}
+
+def lookup_synsets(word):
+    entries = WN_INDEX.get(word)
+    if entries is None:
+        entries = [(syn.name(), syn.definition()) for syn in wn.synsets(word)]
+    return entries
+
+def word_synsets(word):
+    """Yield (name, definition) for each usable synset of word"""
+    for name, defn in lookup_synsets(word):
         if len(name.split("_"))>2:
             continue
         nameparts = name.split('.')
-        
+
         # 1. Skip ONLY the specific bad synset, not the whole word
         if len(nameparts) > 3:
             continue
 
-        type = name.split('.')[1]
-        defn = syn.definition()
-        sword = word*3
-        doc = nlp(sword+" "+defn)
-
-        composition = { 'earth' :0,'air':0, 'water':0,'fire':0}
-        closest = ""
-        max_sim = 0
-        for key in anchors:
-            for anchor_doc in ANCHOR_DOCS[key]:
-                sim = doc.similarity(anchor_doc)
-                if max_sim < sim:
-                    closest = key
-                    max_sim = sim
-            if composition[key] < log_scale(max_sim):
-                composition[key] = log_scale(max_sim)
-        
-        # 2. Save IMMEDIATELY inside the loop
-        data = { 'spirit': closest, 'composition': composition, 'definition': defn}
-        results[name] = data
-        total = len(results.keys())
-        print(f"Processed {total} {name}                   ", end="\r")
-        
-        # Optional: Print progress per added synset if you want, 
-        # or just keep the print in the main loop to reduce spam.
-    
+        yield name, defn
+
+def score_synset(defn, vector):
+    """Score a synset vector against the anchors"""
+    composition = { 'earth' :0,'air':0, 'water':0,'fire':0}
+    if not vector.any():
+        # No known words in the text: every similarity would be 0
+        composition.update(dict.fromkeys(ANCHOR_KEYS, 0))
+        return { 'spirit': "", 'composition': composition, 'definition': defn}
+
+    sims = anchor_similarities(vector)
+
+    # Best anchor per element; each element is scored on the running max so far,
+    # so an element with no anchors takes the score of the ones before it
+    key_max = element_maxima(sims, ANCHOR_STARTS)
+    running = np.maximum.accumulate(np.maximum(key_max, 0))
+
+    composition.update(zip(ANCHOR_KEYS, log_scale_vec(running).tolist()))
+    closest = ANCHOR_KEYS[int(key_max.argmax())] if running[-1] > 0 else ""
+
+    return { 'spirit': closest, 'composition': composition, 'definition': defn}
+
+def score_word(word):
+    """Return {synset name: entry} for every usable synset of word.
+
+    Pure function of its input so it can run in a worker process."""
+    return {name: score_synset(defn, weighted_vector(word, defn))
+            for name, defn in word_synsets(word)}
+
+def process_word(word):
+    entries = score_word(word)
+    if not entries:
+        return None
+    results.update(entries)
     return True
 
 def _process_word(word):
@@ -164,16 +286,10 @@ def _process_word(word):
 
         type = name.split('.')[1]
         defn = syn.definition()
-        doc = nlp(defn)
-
-        composition = {}
-        for key in anchors:
-            max_sim = -1.0
-            for anchor_doc in ANCHOR_DOCS[key]:
-                sim = doc.similarity(anchor_doc)
-                if sim > max_sim:
-                    max_sim = sim
-            composition[key] = log_scale(max_sim)
+        sims = anchor_similarities(text_vector(defn))
+
+        key_max = element_maxima(sims, ANCHOR_STARTS)
+        composition = dict(zip(ANCHOR_KEYS, log_scale_vec(key_max).tolist()))
         if type == 'v':
             composition['air'] = max(64, composition['air'] + bump)
         if type == 'n':
@@ -188,11 +304,13 @@ def _process_word(word):
         return
     data = { 'composition': final_composition, 'definition': defn}
     results[name] = data
-    total = len(results.keys())
-    print(f"Processed {total} {name}____________", end="\r")
     return data
 
 def main():
+    args = parse_args()
+    anchor_dict = load_anchors(args.anchor)
+    configure(anchor_dict, args.wn_index)
+
     # Read words from file
     try:
         with open(args.words, 'r') as f:
@@ -205,15 +323,42 @@ def main():
     total_words = len(words)
     print(f"Processing {total_words} words...", end="\r")
     ft = open(".tmp.counter","w")
-    for i, word in enumerate(words, 1):
-        ft.write(f"{i}\n")
-        ft.flush()
-        process_word(word)
+
+    # Words are independent, so fan them out across processes; map() keeps
+    # input order so the output file is identical to a serial run
+    if args.jobs == 1:
+        pool_context = contextlib.nullcontext()
+    else:
+        pool_context = ProcessPoolExecutor(max_workers=args.jobs, initializer=configure,
+                                           initargs=(anchor_dict, args.wn_index))
+    # Stream entries to JSON-Lines as they arrive so memory stays flat and a
+    # killed run keeps everything processed so far
+    jsonl_path = args.output + '.jsonl'
+    with pool_context as pool:
+        parts = pool.map(score_word, words, chunksize=32) if pool else map(score_word, words)
+        try:
+            with open(jsonl_path, 'w', encoding='utf-8') as out:
+                for i, part in enumerate(tqdm(parts, total=total_words), 1):
+                    ft.write(f"{i}\n")
+                    ft.flush()
+                    for name, data in part.items():
+                        out.write(json.dumps({name: data}, ensure_ascii=False) + "\n")
+        except BaseException:
+            # Don't make the exit wait on chunks nobody will read
+            if pool:
+                pool.shutdown(cancel_futures=True)
+            raise
     ft.write("done")
 
+    # Downstream tools expect a single JSON object; later lines win on
+    # synsets reached from more than one word, same as the old dict update
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            results.update(json.loads(line))
     with open(args.output, 'w', encoding='utf-8') as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
-        print(len(results.keys()))
+        print(len(results))
+    os.remove(jsonl_path)
     
     
     
@@ -0,0 +1,46 @@
+import argparse
+import pickle
+
+from nltk.corpus import wordnet as wn
+
+# Packs WordNet synset lookups into a pickled dict so the dictionary builders
+# can skip NLTK's text-format corpus reader:
+#   { word: [(synset name, definition), ...] }
+# Entries are resolved through wn.synsets() so morphological variants
+# ("dogs", "saw") give exactly the synsets NLTK would return.
+
+
+def build_index(words):
+    index = {}
+    for word in words:
+        if word in index:
+            continue
+        index[word] = [(syn.name(), syn.definition()) for syn in wn.synsets(word)]
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a packed WordNet lookup index')
+    parser.add_argument('--words', default="words.txt", help="Word list to index")
+    parser.add_argument('--output', default="wn_index.pkl", help="Output file name")
+    parser.add_argument('--all-lemmas', action='store_true', help="Also index every WordNet lemma name")
+    args = parser.parse_args()
+
+    try:
+        with open(args.words, 'r') as f:
+            words = [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"Error: {args.words} not found")
+        return
+
+    if args.all_lemmas:
+        words.extend(name for syn in wn.all_synsets() for name in syn.lemma_names())
+
+    index = build_index(words)
+    with open(args.output, 'wb') as f:
+        pickle.dump(index, f, protocol=5)
+    print(f"Indexed {len(index)} words to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
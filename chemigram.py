@@ -1,44 +1,132 @@
+import argparse
 import json
+import sys
 import itertools
-from collections import Counter
+from operator import itemgetter
+import numpy as np
 
-def find_elemental_anagrams(filepath):
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+ELEMENTS = ("air", "water", "earth", "fire")
+_get_elements = itemgetter(*ELEMENTS)
+
+def _element_values(comp):
+    """The four element values of a composition; missing elements count as 0"""
     try:
-        with open(filepath, 'r') as f:
-            lexicon = json.load(f)
+        return _get_elements(comp)
+    except KeyError:
+        return tuple(comp.get(element, 0) for element in ELEMENTS)
+
+def _sort4(values):
+    """Sort each row of an (N, 4) array with a 5 compare-swap sorting network.
+
+    Branchless elementwise min/max over whole columns; returns the four
+    sorted columns (smallest first) rather than a re-stacked array.
+    """
+    a, b, c, d = (values[:, i] for i in range(4))
+    a, b = np.minimum(a, b), np.maximum(a, b)
+    c, d = np.minimum(c, d), np.maximum(c, d)
+    a, c = np.minimum(a, c), np.maximum(a, c)
+    b, d = np.minimum(b, d), np.maximum(b, d)
+    b, c = np.minimum(b, c), np.maximum(b, c)
+    return a, b, c, d
+
+def _pack_keys(columns):
+    """Pack sorted value columns into a single integer key per row.
+
+    Uses one byte per lane (uint32) when every value fits, else 16-bit lanes.
+    Returns (keys, lane_bits), or None unless every value is an integer
+    between 0 and 65535.
+    """
+    lo, hi = columns[0], columns[-1]
+    if lo.size and (lo.min() < 0 or hi.max() > 0xFFFF
+                    or any((col != np.floor(col)).any() for col in columns)):
+        return None
+    if not hi.size or hi.max() <= 0xFF:
+        lane_bits, dtype = 8, np.uint32
+    else:
+        lane_bits, dtype = 16, np.uint64
+    keys = np.zeros(len(lo), dtype=dtype)
+    for col in columns:
+        keys = (keys << dtype(lane_bits)) | col.astype(dtype)
+    return keys, lane_bits
+
+def _unpack_key(key, lane_bits):
+    """Inverse of _pack_keys for one key: back to the sorted value tuple"""
+    mask = (1 << lane_bits) - 1
+    return tuple((key >> (lane_bits * i)) & mask for i in reversed(range(len(ELEMENTS))))
+
+def _anagram_entry(entry_id, data):
+    """Store word and its original mapping for comparison"""
+    return {
+        "translation": entry_id,
+        "word": data["word"],
+        "definition": data.get("definition", ""),
+        "composition": data["composition"]
+    }
+
+def _tuple_anagrams(entries, include_empty):
+    """Group on sorted value tuples, for values that don't pack into integer keys"""
+    anagram_groups = {}
+    for entry_id, data in entries:
+        values = _element_values(data["composition"])
+        if include_empty or any(values):
+            anagram_groups.setdefault(tuple(sorted(values)), []).append(_anagram_entry(entry_id, data))
+    return {str(k): v for k, v in anagram_groups.items() if len(v) > 1}
+
+def find_elemental_anagrams(filepath, include_empty=False):
+    try:
+        with open(filepath, 'rb') as f:
+            lexicon = _json_loads(f.read())
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
     # Map words to their elemental composition values
     # Using a tuple of sorted values as the key to identify anagrams
     # Values: (Air, Water, Earth, Fire)
-    anagram_groups = {}
-    
-    for entry_id, data in lexicon.items():
-        if "composition" in data and "word" in data:
-            comp = data["composition"]
-            # Extract the 4 values and sort them to create a canonical key
-            values = sorted([
-                comp.get("air", 0),
-                comp.get("water", 0),
-                comp.get("earth", 0),
-                comp.get("fire", 0)
-            ])
-            key = tuple(values)
-            
-            if key not in anagram_groups:
-                anagram_groups[key] = []
-            
-            # Store word and its original mapping for comparison
-            anagram_groups[key].append({
-                "translation": entry_id,
-                "word": data["word"],
-                "definition": data.get("definition", ""),
-                "composition": comp
-            })
-
-    # Filter to only groups with more than one word (true anagrams)
-    found_anagrams = {str(k): v for k, v in anagram_groups.items() if len(v) > 1}
+    entries = [(entry_id, data) for entry_id, data in lexicon.items()
+               if "composition" in data and "word" in data]
+
+    # Pull every composition into one (N, 4) array and sort all rows at once;
+    # floats keep fractional values from being truncated into false anagrams
+    try:
+        values = np.fromiter(
+            itertools.chain.from_iterable(_element_values(data["composition"]) for _, data in entries),
+            dtype=np.float64, count=len(entries) * len(ELEMENTS),
+        ).reshape(-1, len(ELEMENTS))
+    except (TypeError, ValueError):
+        return _tuple_anagrams(entries, include_empty)
+
+    # All-zero compositions would otherwise all anagram with each other
+    if not include_empty:
+        keep = values.any(axis=1)
+        entries = list(itertools.compress(entries, keep.tolist()))
+        values = values[keep]
+    packed = _pack_keys(_sort4(values))
+    if packed is None:
+        return _tuple_anagrams(entries, include_empty)
+    keys, lane_bits = packed
+
+    # Group by sorting the keys: equal keys become contiguous runs, and a
+    # stable sort keeps each run in lexicon order
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1], True])
+
+    # Filter to only groups with more than one word (true anagrams),
+    # listed in order of each group's first appearance in the lexicon
+    multi = np.flatnonzero(np.diff(bounds) > 1)
+    starts, ends = bounds[multi], bounds[multi + 1]
+    by_first = np.argsort(order[starts], kind='stable')
+
+    found_anagrams = {}
+    for start, end in zip(starts[by_first].tolist(), ends[by_first].tolist()):
+        key = _unpack_key(int(sorted_keys[start]), lane_bits)
+        found_anagrams[str(key)] = [_anagram_entry(*entries[i]) for i in order[start:end].tolist()]
     return found_anagrams
 
 def print_results(results):
@@ -46,16 +134,16 @@ def print_results(results):
         print("No elemental anagrams found.")
         return
 
-    last = ""
-    for words, key in enumerate(results):
-        if key != last:
-            print(key)
-        for word in results[key]:
-            s = word['translation']
-            print(word['translation'])
-            # print(key,':',word['word'],':',s,':',word['definition'])
-        last=key
+    # Build the whole listing and write it once instead of a print per line
+    lines = []
+    for key, group in results.items():
+        lines.append(key)
+        lines.extend(word['translation'] for word in group)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
-    results = find_elemental_anagrams('conlang_lexicon.json')
+    parser = argparse.ArgumentParser(description='Find words with matching elemental compositions')
+    parser.add_argument('--include-empty', action='store_true', help="Also group entries whose composition is all zero")
+    args = parser.parse_args()
+    results = find_elemental_anagrams('conlang_lexicon.json', include_empty=args.include_empty)
     print_results(results)
\ No newline at end of file
@@ -4,11 +4,12 @@ Components Anchors Editor - Tkinter version for better components editing
 Creates a clean interface for editing components anchors JSON with proper tables
 """
 
-import json
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 import os
 
+from edit_elementals import JSON_FILETYPES, load_anchors_data, write_json
+
 
 class ComponentsEditorTk:
     def __init__(self, root):
@@ -27,65 +28,7 @@ class ComponentsEditorTk:
     
     def _load_anchors_data(self):
         """Load components anchors dictionary from JSON file"""
-        try:
-            # Try to load from a default anchors JSON file first
-            default_file = 'default_anchors.json'
-            if os.path.exists(default_file):
-                with open(default_file, 'r', encoding='utf-8') as f:
-                    anchors_dict = json.load(f)
-                print(f"Loaded anchors dictionary from {default_file}")
-                return anchors_dict
-            
-            # If default doesn't exist, try to extract from build_elemental_dictionary.py and save as JSON
-            with open('build_elemental_dictionary.py', 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract the anchors dictionary using a simple approach
-            # Look for the anchors dictionary definition
-            anchors_start = content.find('anchors =')
-            if anchors_start == -1:
-                print("Error: anchors dictionary not found in build_elemental_dictionary.py")
-                return {}
-            
-            # Find the opening brace
-            brace_start = content.find('{', anchors_start)
-            if brace_start == -1:
-                print("Error: anchors dictionary format not found")
-                return {}
-            
-            # Find the matching closing brace (simple approach - count braces)
-            brace_count = 1
-            pos = brace_start + 1
-            while pos < len(content) and brace_count > 0:
-                if content[pos] == '{':
-                    brace_count += 1
-                elif content[pos] == '}':
-                    brace_count -= 1
-                pos += 1
-            
-            if brace_count != 0:
-                print("Error: Could not parse anchors dictionary")
-                return {}
-            
-            # Extract the dictionary string
-            anchors_str = content[brace_start:pos]
-            
-            # Evaluate the dictionary string safely
-            anchors_dict = eval(anchors_str)
-            
-            # Save as default JSON file for future use
-            with open(default_file, 'w', encoding='utf-8') as f:
-                json.dump(anchors_dict, f, indent=2, ensure_ascii=False)
-            
-            print(f"Loaded and saved anchors dictionary with {len(anchors_dict)} components")
-            return anchors_dict
-            
-        except FileNotFoundError:
-            print("Error: build_elemental_dictionary.py not found")
-            return {}
-        except Exception as e:
-            print(f"Error parsing anchors dictionary: {e}")
-            return {}
+        return load_anchors_data()
     
     def _create_main_interface(self):
         """Create the main interface with notebook for tabs and controls"""
@@ -113,10 +56,20 @@ class ComponentsEditorTk:
         # Create tabs for each element
         self.widgets = {}
         self.tab_to_component = {}
+        # Lowercased names for duplicate checks, so "Fire" and "fire" collide
+        self._component_names = {name.lower() for name in self.anchors_data}
+        # Tabs whose widgets haven't been built yet, keyed by tab id
+        self._unpopulated = {}
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
         
         for component_name, component_list in self.anchors_data.items():
             self._create_component_tab(component_name, component_list)
         
+        # Only the first tab is built up front; the rest wait until shown
+        tabs = self.notebook.tabs()
+        if tabs:
+            self._populate_tab(tabs[0])
+        
         # Add save button at bottom
         button_frame = ttk.Frame(self.root)
         button_frame.pack(fill='x', padx=10, pady=5)
@@ -129,13 +82,28 @@ class ComponentsEditorTk:
         self.status_label.pack(side='left', padx=5)
     
     def _create_component_tab(self, component_name, component_list):
-        """Create component tab with list editing"""
+        """Add an empty component tab; its widgets are built on first selection"""
         # Create tab
         tab_frame = ttk.Frame(self.notebook)
         
         # Create styled tab with color
         self.notebook.add(tab_frame, text=component_name.upper())
         self.tab_to_component[str(tab_frame)] = component_name
+        self._unpopulated[str(tab_frame)] = component_list
+    
+    def _on_tab_changed(self, event=None):
+        """Build the selected tab's widgets if it hasn't been shown before"""
+        current_tab = self.notebook.select()
+        if current_tab:
+            self._populate_tab(current_tab)
+    
+    def _populate_tab(self, tab):
+        """Create component tab contents with list editing"""
+        component_list = self._unpopulated.pop(tab, None)
+        if component_list is None:
+            return
+        component_name = self.tab_to_component[tab]
+        tab_frame = self.root.nametowidget(tab)
         
         # Description
         desc_frame = ttk.Frame(tab_frame)
@@ -179,11 +147,15 @@ class ComponentsEditorTk:
         remove_btn = ttk.Button(entry_frame, text="Remove Selected", command=lambda: self._remove_list_item(listbox))
         remove_btn.pack(side='left', padx=5)
         
-        # Store reference
-        self.widgets[component_name] = listbox
+        # Store direct references so rename/save never walk the widget tree
+        self.widgets[component_name] = {
+            'listbox': listbox,
+            'title': title_label,
+            'desc': desc_label,
+        }
         # Populate initial items
-        for item in component_list:
-            listbox.insert('end', item)
+        if component_list:
+            listbox.insert('end', *component_list)
     
     def _add_list_item(self, listbox, entry):
         """Add new item to listbox"""
@@ -211,25 +183,26 @@ class ComponentsEditorTk:
         try:
             saved_data = {}
             
-            # Save components categories
-            for component_name, widget in self.widgets.items():
-                component_list = []
-                for i in range(widget.size()):
-                    item_text = widget.get(i)
-                    if item_text.strip():
-                        component_list.append(item_text.strip())
-                saved_data[component_name] = component_list
+            # Save components categories in tab order; tabs never opened
+            # still hold their original list
+            for tab in self.notebook.tabs():
+                component_name = self.tab_to_component[tab]
+                if tab in self._unpopulated:
+                    items = self._unpopulated[tab]
+                else:
+                    # One Tcl call for the whole listbox instead of one per item
+                    items = self.widgets[component_name]['listbox'].get(0, 'end')
+                saved_data[component_name] = [s.strip() for s in items if s.strip()]
             
             # Show save dialog
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                filetypes=JSON_FILETYPES,
                 initialfile="custom_anchors.json"
             )
             
             if file_path:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(saved_data, f, indent=2, ensure_ascii=False)
+                write_json(file_path, saved_data)
                 
                 self.status_label.config(text=f"Saved to {os.path.basename(file_path)}")
                 messagebox.showinfo("Success", f"Components anchors saved to:\n{file_path}")
@@ -246,11 +219,12 @@ class ComponentsEditorTk:
         if not name:
             messagebox.showwarning("Add Component", "Please enter a component name.")
             return
-        if name in self.widgets:
+        if name.lower() in self._component_names:
             messagebox.showwarning("Add Component", "Component already exists.")
             return
         # Create new tab and data entry
         self.anchors_data[name] = []
+        self._component_names.add(name.lower())
         self._create_component_tab(name, [])
         self.component_name_entry.delete(0, 'end')
         # Select the new tab
@@ -274,28 +248,22 @@ class ComponentsEditorTk:
         new_name = new_name.strip()
         if not new_name:
             return
-        if new_name in self.widgets and new_name != old_name:
+        if new_name.lower() in self._component_names and new_name.lower() != old_name.lower():
             messagebox.showwarning("Rename Component", "A component with that name already exists.")
             return
         # Update mappings and UI
-        widget = self.widgets.pop(old_name)
-        self.widgets[new_name] = widget
+        self._populate_tab(current_tab)
+        widgets = self.widgets.pop(old_name)
+        self.widgets[new_name] = widgets
+        self._component_names.discard(old_name.lower())
+        self._component_names.add(new_name.lower())
         if old_name in self.anchors_data:
             self.anchors_data[new_name] = self.anchors_data.pop(old_name)
         self.tab_to_component[current_tab] = new_name
         self.notebook.tab(current_tab, text=new_name.upper())
-        # Update title label in the tab
-        tab_widget = self.root.nametowidget(current_tab)
-        # First child is desc_frame; its first child is title_label
-        try:
-            desc_frame = tab_widget.winfo_children()[0]
-            title_label = desc_frame.winfo_children()[0]
-            title_label.config(text=f"=== {new_name.upper()} ===")
-            # Update description label (second child)
-            desc_label = desc_frame.winfo_children()[1]
-            desc_label.config(text=f"Edit {new_name} component concepts and anchors")
-        except Exception:
-            pass
+        # Update title and description labels in the tab
+        widgets['title'].config(text=f"=== {new_name.upper()} ===")
+        widgets['desc'].config(text=f"Edit {new_name} component concepts and anchors")
         self.status_label.config(text=f"Renamed component to '{new_name}'")
 
     def _remove_selected_component(self):
@@ -316,8 +284,10 @@ class ComponentsEditorTk:
         except Exception:
             pass
         self.tab_to_component.pop(current_tab, None)
+        self._unpopulated.pop(current_tab, None)
         self.widgets.pop(name, None)
         self.anchors_data.pop(name, None)
+        self._component_names.discard(name.lower())
         self.status_label.config(text=f"Removed component '{name}'")
 
 
@@ -4,12 +4,141 @@ Elemental Anchors Editor - Tkinter version for better elemental editing
 Creates a clean interface for editing elemental anchors JSON with proper tables
 """
 
+import ast
 import json
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
 import argparse
 import sys
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# File type choices for the save dialog
+JSON_FILETYPES = (("JSON files", "*.json"), ("All files", "*.*"))
+
+
+def _read_json(path):
+    """Read a JSON file in one buffered binary read"""
+    with open(path, 'rb', buffering=65536) as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _new_file_mode(probe_path):
+    """Mode a plain open() would give a new file here (0o666 minus the umask).
+
+    Creates and removes a probe file rather than toggling os.umask(), which
+    is process-wide and saves can run on a worker thread.
+    """
+    fd = os.open(probe_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        return os.fstat(fd).st_mode & 0o7777
+    finally:
+        os.close(fd)
+        os.unlink(probe_path)
+
+
+def write_json(path, data):
+    """Write data as indented UTF-8 JSON, replacing the file atomically"""
+    if orjson:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    # Write beside the target and swap it in, so an interrupted save
+    # never leaves a truncated file behind
+    tmp = tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(os.path.abspath(path)),
+                                      prefix='.tmp-', suffix='.json', delete=False)
+    try:
+        with tmp:
+            tmp.write(payload)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        # NamedTemporaryFile is owner-only; keep the target's permissions,
+        # or the usual umask-derived ones for a new file
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = _new_file_mode(tmp.name + '.mode')
+        os.chmod(tmp.name, mode)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+# Element-appropriate colors for styling
+ELEMENT_COLORS = {
+    'air': '#87CEEB',      # Light blue
+    'water': '#4169E1',    # Blue
+    'earth': '#8B4513',    # Brown
+    'fire': '#FF4500'       # Red-orange
+}
+
+# Parsed anchors files by path, as (mtime_ns, data)
+_ANCHORS_CACHE = {}
+
+
+def _read_anchors_file(path):
+    """Load an anchors JSON file, reusing the last parse while its mtime is unchanged"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _ANCHORS_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _ANCHORS_CACHE[path] = (mtime, _read_json(path))
+    # Callers edit the dict and its lists in place, so hand out fresh ones;
+    # anchors are {name: [str]}, so copying the lists is enough
+    return {name: list(items) for name, items in cached[1].items()}
+
+
+def load_anchors_data(language_name=None, default_file='default_anchors.json'):
+    """Load the anchors dictionary used by the elementals and components editors"""
+    try:
+        # Try to load from language-specific anchors file first
+        anchors_file = f"{language_name}_anchors.json" if language_name else None
+        if anchors_file and os.path.exists(anchors_file):
+            anchors_dict = _read_anchors_file(anchors_file)
+            print(f"Loaded anchors dictionary from {anchors_file}")
+            return anchors_dict
+        
+        # Try to load from a default anchors JSON file
+        if os.path.exists(default_file):
+            anchors_dict = _read_anchors_file(default_file)
+            print(f"Loaded anchors dictionary from {default_file}")
+            return anchors_dict
+        
+        # If default doesn't exist, try to extract from build_elemental_dictionary.py and save as JSON
+        with open('build_elemental_dictionary.py', 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Find the module-level `anchors = {...}` assignment and parse
+        # its literal value; strings containing braces can't confuse it
+        anchors_dict = None
+        for node in ast.parse(content).body:
+            if isinstance(node, ast.Assign) and any(
+                    isinstance(t, ast.Name) and t.id == 'anchors' for t in node.targets):
+                anchors_dict = ast.literal_eval(node.value)
+                break
+        if anchors_dict is None:
+            print("Error: anchors dictionary not found in build_elemental_dictionary.py")
+            return {}
+        
+        # Save as default JSON file for future use
+        write_json(default_file, anchors_dict)
+        
+        print(f"Loaded and saved anchors dictionary with {len(anchors_dict)} entries")
+        return anchors_dict
+        
+    except FileNotFoundError:
+        print("Error: build_elemental_dictionary.py not found")
+        return {}
+    except Exception as e:
+        print(f"Error parsing anchors dictionary: {e}")
+        return {}
 
 
 class ElementalsEditorTk:
@@ -30,73 +159,7 @@ class ElementalsEditorTk:
     
     def _load_anchors_data(self):
         """Load elemental anchors dictionary from JSON file"""
-        try:
-            # Try to load from language-specific anchors file first
-            anchors_file = f"{self.language_name}_anchors.json"
-            if os.path.exists(anchors_file):
-                with open(anchors_file, 'r', encoding='utf-8') as f:
-                    anchors_dict = json.load(f)
-                print(f"Loaded anchors dictionary from {anchors_file}")
-                return anchors_dict
-            
-            # Try to load from a default anchors JSON file
-            default_file = 'default_anchors.json'
-            if os.path.exists(default_file):
-                with open(default_file, 'r', encoding='utf-8') as f:
-                    anchors_dict = json.load(f)
-                print(f"Loaded anchors dictionary from {default_file}")
-                return anchors_dict
-            
-            # If default doesn't exist, try to extract from build_elemental_dictionary.py and save as JSON
-            with open('build_elemental_dictionary.py', 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract the anchors dictionary using a simple approach
-            # Look for the anchors dictionary definition
-            anchors_start = content.find('anchors =')
-            if anchors_start == -1:
-                print("Error: anchors dictionary not found in build_elemental_dictionary.py")
-                return {}
-            
-            # Find the opening brace
-            brace_start = content.find('{', anchors_start)
-            if brace_start == -1:
-                print("Error: anchors dictionary format not found")
-                return {}
-            
-            # Find the matching closing brace (simple approach - count braces)
-            brace_count = 1
-            pos = brace_start + 1
-            while pos < len(content) and brace_count > 0:
-                if content[pos] == '{':
-                    brace_count += 1
-                elif content[pos] == '}':
-                    brace_count -= 1
-                pos += 1
-            
-            if brace_count != 0:
-                print("Error: Could not parse anchors dictionary")
-                return {}
-            
-            # Extract the dictionary string
-            anchors_str = content[brace_start:pos]
-            
-            # Evaluate the dictionary string safely
-            anchors_dict = eval(anchors_str)
-            
-            # Save as default JSON file for future use
-            with open(default_file, 'w', encoding='utf-8') as f:
-                json.dump(anchors_dict, f, indent=2, ensure_ascii=False)
-            
-            print(f"Loaded and saved anchors dictionary with {len(anchors_dict)} elements")
-            return anchors_dict
-            
-        except FileNotFoundError:
-            print("Error: build_elemental_dictionary.py not found")
-            return {}
-        except Exception as e:
-            print(f"Error parsing anchors dictionary: {e}")
-            return {}
+        return load_anchors_data(self.language_name)
     
     def _create_main_interface(self):
         """Create the main interface with notebook for tabs"""
@@ -126,15 +189,7 @@ class ElementalsEditorTk:
         # Create tab
         tab_frame = ttk.Frame(self.notebook)
         
-        # Element-appropriate colors for styling
-        element_colors = {
-            'air': '#87CEEB',      # Light blue
-            'water': '#4169E1',    # Blue
-            'earth': '#8B4513',    # Brown
-            'fire': '#FF4500'       # Red-orange
-        }
-        
-        color = element_colors.get(element_name.lower(), '#808080')
+        color = ELEMENT_COLORS.get(element_name.lower(), '#808080')
         
         # Create styled tab with color
         self.notebook.add(tab_frame, text=element_name.upper())
@@ -203,8 +258,8 @@ class ElementalsEditorTk:
         """Load data into all widgets"""
         for element_name, widget in self.widgets.items():
             element_list = self.anchors_data.get(element_name, [])
-            for item in element_list:
-                widget.insert('end', item)
+            if element_list:
+                widget.insert('end', *element_list)
     
     def _save_data(self):
         """Save all data back to JSON file"""
@@ -213,23 +268,18 @@ class ElementalsEditorTk:
             
             # Save elemental categories
             for element_name, widget in self.widgets.items():
-                element_list = []
-                for i in range(widget.size()):
-                    item_text = widget.get(i)
-                    if item_text.strip():
-                        element_list.append(item_text.strip())
+                element_list = [s.strip() for s in widget.get(0, 'end') if s.strip()]
                 saved_data[element_name] = element_list
             
             # Show save dialog
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                filetypes=JSON_FILETYPES,
                 initialfile=f"{self.language_name}_anchors.json"
             )
             
             if file_path:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(saved_data, f, indent=2, ensure_ascii=False)
+                write_json(file_path, saved_data)
                 
                 self.status_label.config(text=f"Saved to {os.path.basename(file_path)}")
                 messagebox.showinfo("Success", f"Elemental anchors saved to:\n{file_path}")
@@ -6,19 +6,94 @@ Creates a clean interface for editing phonetic dictionary JSON with proper table
 
 import time
 import argparse
+import functools
 import json
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
+import pickle
 import sys
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from edit_elementals import JSON_FILETYPES, write_json
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+def _normalize_phonetics(data):
+    """NFC-normalize the phoneme lists so composed and decomposed forms match"""
+    for category_data in data.values():
+        if isinstance(category_data, dict):
+            for sub_key, phonetic_list in category_data.items():
+                if isinstance(phonetic_list, list):
+                    category_data[sub_key] = [
+                        unicodedata.normalize('NFC', p) if isinstance(p, str) else p
+                        for p in phonetic_list
+                    ]
+    return data
+
+
+def _read_phonetic_file(path):
+    """Parse a phonetic dictionary, reusing a pickled copy while the JSON is unchanged"""
+    cache_path = path + '.cache.pkl'
+    # The sidecar stores the JSON's (mtime, size) it was built from
+    st = os.stat(path)
+    signature = (st.st_mtime_ns, st.st_size)
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_signature, data = pickle.load(f)
+        if cached_signature == signature:
+            return data
+    except Exception:
+        # Missing, stale-format or unreadable sidecar; fall back to the JSON
+        pass
+    
+    with open(path, 'rb') as f:
+        data = _normalize_phonetics(_json_loads(f.read()))
+    tmp_path = cache_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((signature, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return data
+
 
 class PhoneticEditorTk:
+    # POS information mapping
+    _POS_INFO = {
+        'n': {'full': 'Noun', 'desc': 'A person place thing or idea', 'examples': 'dog / happiness / fire', 'sounds': 'Heavy clusters (Kn/Gr/Wr)'},
+        'v': {'full': 'Verb', 'desc': 'An action or state of being', 'examples': 'run / exist / burn', 'sounds': 'Sharp percussive (T/P/K)'},
+        'a': {'full': 'Adjective', 'desc': 'Descriptive word modifying a noun', 'examples': 'red / loud / soft', 'sounds': 'Breathy fricatives (F/S/H)'},
+        'r': {'full': 'Adverb', 'desc': 'Modifies a verb or adjective', 'examples': 'quickly / very', 'sounds': 'Glides/Liquids (J/W/M)'},
+        's': {'full': 'Adjective Satellite', 'desc': 'An adjective linked to a specific head word', 'examples': 'wet (linked to dry)', 'sounds': 'Sibilants (Z/S)'},
+        'e': {'full': 'Exclamation', 'desc': 'Words expressing sudden emotion', 'examples': 'wow / oh / ouch', 'sounds': 'Breathy/Airy'},
+        'k': {'full': 'Conjunction', 'desc': 'Connects words or clauses', 'examples': 'and / but / or', 'sounds': 'Hard Stops (G/K)'},
+        'i': {'full': 'Preposition', 'desc': 'Shows relationship between nouns', 'examples': 'in / on / by', 'sounds': 'Labials (B/F/M)'},
+        'd': {'full': 'Determiner', 'desc': 'Introduces a noun', 'examples': 'the / a / that', 'sounds': 'Dental Fricatives (Th/D)'},
+        'o': {'full': 'Pronoun', 'desc': 'Substitutes for a noun', 'examples': 'he / it / they', 'sounds': 'Soft Air (H/W)'}
+    }
+    # Section description line for each POS
+    _POS_DESC = {
+        key: f"{info['desc']} | Examples: {info['examples']} | Sounds: {info['sounds']}"
+        for key, info in _POS_INFO.items()
+    }
+    
     def __init__(self, root, language_name):
         self.language_name = language_name
         self.root = root
         self.root.title("Phonetic Dictionary Editor")
         self.root.geometry("800x600")
         
+        # Single worker so saves hit the disk in the order they were made
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        
         # Load data
         self.phonetic_data = self._load_phonetic_data()
         
@@ -32,8 +107,7 @@ class PhoneticEditorTk:
         """Load phonetic dictionary from JSON file"""
         try:
             filename = f"{self.language_name}_phonetic_dictionary.json"
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _read_phonetic_file(filename)
             print(f"Loaded phonetic dictionary with {len(data)} categories")
             return data
         except FileNotFoundError:
@@ -51,6 +125,9 @@ class PhoneticEditorTk:
         
         # Create tabs for each category
         self.widgets = {}
+        # Phonetic tabs whose widgets haven't been built yet, keyed by tab id
+        self._unpopulated = {}
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
         
         for category_name, category_data in self.phonetic_data.items():
             if category_name == 'constraints':
@@ -60,6 +137,9 @@ class PhoneticEditorTk:
             elif isinstance(category_data, dict):
                 self._create_phonetic_tab(category_name, category_data)
         
+        # Build whichever tab is showing now; the rest wait until selected
+        self._on_tab_changed()
+        
         # Add save button at bottom
         button_frame = ttk.Frame(self.root)
         button_frame.pack(fill='x', padx=10, pady=5)
@@ -175,7 +255,9 @@ class PhoneticEditorTk:
         # Bind selection change to populate inputs
         tree.bind('<<TreeviewSelect>>', lambda event: self._on_ortho_select(tree))
         
-        # Bind input changes to update selected row
+        # Bind input changes to update selected row, at most once per idle pass
+        self._ortho_updating = False
+        self._ortho_pending = None
         self.ortho_from_var.trace('w', lambda *args: self._update_ortho_row(tree))
         self.ortho_to_var.trace('w', lambda *args: self._update_ortho_row(tree))
         
@@ -186,29 +268,30 @@ class PhoneticEditorTk:
         self.widgets[category_name] = tree
     
     def _create_phonetic_tab(self, category_name, category_data):
-        """Create phonetic tab with list editing"""
+        """Add an empty phonetic tab; its widgets are built on first selection"""
         # Create tab
         tab_frame = ttk.Frame(self.notebook)
         self.notebook.add(tab_frame, text=category_name.replace('_', ' ').title())
+        self._unpopulated[str(tab_frame)] = category_name
+    
+    def _on_tab_changed(self, event=None):
+        """Build the selected phonetic tab if it hasn't been shown before"""
+        current_tab = self.notebook.select()
+        if current_tab:
+            self._populate_phonetic_tab(current_tab)
+    
+    def _populate_phonetic_tab(self, tab):
+        """Create phonetic tab contents with list editing"""
+        category_name = self._unpopulated.pop(tab, None)
+        if category_name is None:
+            return
+        category_data = self.phonetic_data[category_name]
+        tab_frame = self.root.nametowidget(tab)
         
         # Description
         desc_label = ttk.Label(tab_frame, text=f"Edit {category_name} phonetic elements", font=('Arial', 10))
         desc_label.pack(pady=5)
         
-        # POS information mapping
-        pos_info = {
-            'n': {'full': 'Noun', 'desc': 'A person place thing or idea', 'examples': 'dog / happiness / fire', 'sounds': 'Heavy clusters (Kn/Gr/Wr)'},
-            'v': {'full': 'Verb', 'desc': 'An action or state of being', 'examples': 'run / exist / burn', 'sounds': 'Sharp percussive (T/P/K)'},
-            'a': {'full': 'Adjective', 'desc': 'Descriptive word modifying a noun', 'examples': 'red / loud / soft', 'sounds': 'Breathy fricatives (F/S/H)'},
-            'r': {'full': 'Adverb', 'desc': 'Modifies a verb or adjective', 'examples': 'quickly / very', 'sounds': 'Glides/Liquids (J/W/M)'},
-            's': {'full': 'Adjective Satellite', 'desc': 'An adjective linked to a specific head word', 'examples': 'wet (linked to dry)', 'sounds': 'Sibilants (Z/S)'},
-            'e': {'full': 'Exclamation', 'desc': 'Words expressing sudden emotion', 'examples': 'wow / oh / ouch', 'sounds': 'Breathy/Airy'},
-            'k': {'full': 'Conjunction', 'desc': 'Connects words or clauses', 'examples': 'and / but / or', 'sounds': 'Hard Stops (G/K)'},
-            'i': {'full': 'Preposition', 'desc': 'Shows relationship between nouns', 'examples': 'in / on / by', 'sounds': 'Labials (B/F/M)'},
-            'd': {'full': 'Determiner', 'desc': 'Introduces a noun', 'examples': 'the / a / that', 'sounds': 'Dental Fricatives (Th/D)'},
-            'o': {'full': 'Pronoun', 'desc': 'Substitutes for a noun', 'examples': 'he / it / they', 'sounds': 'Soft Air (H/W)'}
-        }
-        
         # Create scrollable frame for POS categories
         canvas = tk.Canvas(tab_frame)
         scrollbar = ttk.Scrollbar(tab_frame, orient="vertical", command=canvas.yview)
@@ -227,15 +310,15 @@ class PhoneticEditorTk:
         
         for sub_key, phonetic_list in category_data.items():
             # Get POS info
-            info = pos_info.get(sub_key, {})
+            info = self._POS_INFO.get(sub_key, {})
             
             # POS section frame
             pos_frame = ttk.LabelFrame(scrollable_frame, text=f"{sub_key.upper()} - {info.get('full', sub_key.upper())}", padding=10)
             pos_frame.pack(fill='x', padx=5, pady=5)
             
             # Add description if available
-            if info:
-                desc_text = f"{info['desc']} | Examples: {info['examples']} | Sounds: {info['sounds']}"
+            desc_text = self._POS_DESC.get(sub_key)
+            if desc_text:
                 desc_label = ttk.Label(pos_frame, text=desc_text, font=('Arial', 9), foreground='gray')
                 desc_label.pack(anchor='w', pady=(0, 5))
             
@@ -245,6 +328,8 @@ class PhoneticEditorTk:
             
             phonetic_listbox = tk.Listbox(list_frame, height=4)
             phonetic_listbox.pack(side='left', fill='x', expand=True)
+            if phonetic_list:
+                phonetic_listbox.insert('end', *phonetic_list)
             
             # Buttons for this POS
             pos_btn_frame = ttk.Frame(pos_frame)
@@ -252,12 +337,13 @@ class PhoneticEditorTk:
             
             entry = ttk.Entry(pos_btn_frame, width=30)
             entry.pack(side='left', padx=5, fill='x', expand=True)
-            entry.bind('<Return>', lambda e, lb=phonetic_listbox, ent=entry: self._add_phonetic_item(lb, ent))
+            add_item = functools.partial(self._add_phonetic_item, phonetic_listbox, entry)
+            entry.bind('<Return>', add_item)
             
-            add_btn = ttk.Button(pos_btn_frame, text="Add", command=lambda lb=phonetic_listbox, ent=entry: self._add_phonetic_item(lb, ent))
+            add_btn = ttk.Button(pos_btn_frame, text="Add", command=add_item)
             add_btn.pack(side='left', padx=2)
             
-            remove_btn = ttk.Button(pos_btn_frame, text="Remove", command=lambda lb=phonetic_listbox: self._remove_phonetic_item(lb))
+            remove_btn = ttk.Button(pos_btn_frame, text="Remove", command=functools.partial(self._remove_phonetic_item, phonetic_listbox))
             remove_btn.pack(side='left', padx=2)
             
             # Store reference
@@ -354,23 +440,33 @@ class PhoneticEditorTk:
         """Handle selection change in orthography treeview"""
         selection = tree.selection()
         if selection:
-            item = selection[0]
-            values = tree.item(item)['values']
+            values = tree.item(selection[0], 'values')
             if len(values) >= 2:
-                self.ortho_from_var.set(values[0])
-                self.ortho_to_var.set(values[1])
+                self._set_ortho_inputs(values[0], values[1])
         else:
-            self.ortho_from_var.set("")
-            self.ortho_to_var.set("")
+            self._set_ortho_inputs("", "")
+    
+    def _set_ortho_inputs(self, from_val, to_val):
+        """Fill the input fields without writing them back into the tree"""
+        self._ortho_updating = True
+        try:
+            self.ortho_from_var.set(from_val)
+            self.ortho_to_var.set(to_val)
+        finally:
+            self._ortho_updating = False
     
     def _update_ortho_row(self, tree):
         """Update selected row when input fields change"""
+        if self._ortho_updating or self._ortho_pending is not None:
+            return
+        self._ortho_pending = self.root.after_idle(self._flush_ortho_row, tree)
+    
+    def _flush_ortho_row(self, tree):
+        """Copy the input fields into the selected row"""
+        self._ortho_pending = None
         selection = tree.selection()
         if selection:
-            item = selection[0]
-            from_val = self.ortho_from_var.get()
-            to_val = self.ortho_to_var.get()
-            tree.item(item, values=(from_val, to_val))
+            tree.item(selection[0], values=(self.ortho_from_var.get(), self.ortho_to_var.get()))
     
     def _add_ortho_row(self, tree):
         """Add new row using input field values"""
@@ -378,12 +474,11 @@ class PhoneticEditorTk:
         to_val = self.ortho_to_var.get()
         tree.insert('', 'end', values=(from_val, to_val))
         # Clear inputs after adding
-        self.ortho_from_var.set("")
-        self.ortho_to_var.set("")
+        self._set_ortho_inputs("", "")
     
-    def _add_phonetic_item(self, listbox, entry):
+    def _add_phonetic_item(self, listbox, entry, event=None):
         """Add new phonetic item to listbox"""
-        text = entry.get().strip()
+        text = unicodedata.normalize('NFC', entry.get().strip())
         if text:
             listbox.insert('end', text)
             entry.delete(0, 'end')
@@ -414,14 +509,6 @@ class PhoneticEditorTk:
                     from_pat = rule.get('from', '')
                     to_pat = rule.get('to', '')
                     widget.insert('', 'end', values=(from_pat, to_pat))
-            
-            elif isinstance(category_data, dict) and isinstance(widget, dict):
-                # Load phonetic data into individual POS listboxes
-                for sub_key, phonetic_list in category_data.items():
-                    if sub_key in widget:
-                        listbox = widget[sub_key]
-                        for item in phonetic_list:
-                            listbox.insert('end', item)
     
     def _save_data(self):
         """Save all data back to JSON file"""
@@ -433,8 +520,8 @@ class PhoneticEditorTk:
                 constraints = []
                 tree = self.widgets['constraints']
                 for child in tree.get_children():
-                    values = tree.item(child)['values']
-                    pattern, reason = values[0], values[1]
+                    # Ask Tk for just the values instead of the full option dict
+                    pattern, reason = map(str, tree.item(child, 'values')[:2])
                     if pattern:  # Only include non-empty patterns
                         constraints.append({'pattern': pattern, 'reason': reason})
                 saved_data['constraints'] = constraints
@@ -444,46 +531,59 @@ class PhoneticEditorTk:
                 orthography = []
                 tree = self.widgets['orthography']
                 for child in tree.get_children():
-                    values = tree.item(child)['values']
-                    from_pat, to_pat = values[0], values[1]
+                    from_pat, to_pat = map(str, tree.item(child, 'values')[:2])
                     if from_pat:  # Only include non-empty patterns
                         orthography.append({'from': from_pat, 'to': to_pat})
                 saved_data['orthography'] = orthography
             
-            # Save phonetic categories
-            for category_name, widget in self.widgets.items():
-                if category_name not in ['constraints', 'orthography'] and isinstance(widget, dict):
+            # Save phonetic categories; tabs never opened still hold the loaded lists
+            for category_name, category_data in self.phonetic_data.items():
+                if category_name in ['constraints', 'orthography'] or not isinstance(category_data, dict):
+                    continue
+                widget = self.widgets.get(category_name)
+                if isinstance(widget, dict):
                     # Parse individual POS listboxes back into dictionary format
-                    category_dict = {}
-                    for sub_key, listbox in widget.items():
-                        phonetic_list = []
-                        for i in range(listbox.size()):
-                            item_text = listbox.get(i)
-                            if item_text.strip():
-                                phonetic_list.append(item_text.strip())
-                        if phonetic_list:  # Only include non-empty categories
-                            category_dict[sub_key] = phonetic_list
-                    saved_data[category_name] = category_dict
+                    items = {sub_key: listbox.get(0, 'end') for sub_key, listbox in widget.items()}
+                else:
+                    items = category_data
+                category_dict = {}
+                for sub_key, phonetic_list in items.items():
+                    phonetic_list = [s.strip() for s in phonetic_list if s.strip()]
+                    if phonetic_list:  # Only include non-empty categories
+                        category_dict[sub_key] = phonetic_list
+                saved_data[category_name] = category_dict
             
             # Show save dialog
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                filetypes=JSON_FILETYPES,
                 initialfile=self.language_name+"_phonetic_dictionary.json"
             )
             
             if file_path:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(saved_data, f, indent=2, ensure_ascii=False)
-                
-                self.status_label.config(text=f"Saved to {os.path.basename(file_path)}")
-                messagebox.showinfo("Success", f"Phonetic dictionary saved to:\n{file_path}")
+                # Serialize and write on the worker; Tk is only touched from here
+                future = self._io_pool.submit(write_json, file_path, saved_data)
+                self.status_label.config(text=f"Saving to {os.path.basename(file_path)}...")
+                self.root.after(50, self._check_save, future, file_path)
             else:
                 self.status_label.config(text="Save cancelled")
                 
         except Exception as e:
             messagebox.showerror("Error", f"Error saving file: {str(e)}")
             self.status_label.config(text="Error saving")
+    
+    def _check_save(self, future, file_path):
+        """Poll a background save from the Tk thread and report when it finishes"""
+        if not future.done():
+            self.root.after(50, self._check_save, future, file_path)
+            return
+        error = future.exception()
+        if error:
+            messagebox.showerror("Error", f"Error saving file: {str(error)}")
+            self.status_label.config(text="Error saving")
+        else:
+            self.status_label.config(text=f"Saved to {os.path.basename(file_path)}")
+            messagebox.showinfo("Success", f"Phonetic dictionary saved to:\n{file_path}")
 
 
 def main():
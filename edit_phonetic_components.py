@@ -12,6 +12,9 @@ from tkinter import ttk, messagebox, filedialog
 import os
 import sys
 
+from edit_elementals import JSON_FILETYPES
+
+
 class PhoneticEditorTk:
     def __init__(self, root, language_name):
         self.language_name = language_name
@@ -419,8 +422,8 @@ class PhoneticEditorTk:
                 for sub_key, phonetic_list in category_data.items():
                     if sub_key in widget:
                         listbox = widget[sub_key]
-                        for item in phonetic_list:
-                            listbox.insert('end', item)
+                        if phonetic_list:
+                            listbox.insert('end', *phonetic_list)
     
     def _save_data(self):
         """Save all data back to JSON file"""
@@ -455,11 +458,7 @@ class PhoneticEditorTk:
                     # Parse individual POS listboxes back into dictionary format
                     category_dict = {}
                     for sub_key, listbox in widget.items():
-                        phonetic_list = []
-                        for i in range(listbox.size()):
-                            item_text = listbox.get(i)
-                            if item_text.strip():
-                                phonetic_list.append(item_text.strip())
+                        phonetic_list = [s.strip() for s in listbox.get(0, 'end') if s.strip()]
                         if phonetic_list:  # Only include non-empty categories
                             category_dict[sub_key] = phonetic_list
                     saved_data[category_name] = category_dict
@@ -467,7 +466,7 @@ class PhoneticEditorTk:
             # Show save dialog
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                filetypes=JSON_FILETYPES,
                 initialfile=self.language_name+"_phonetic_dictionary.json"
             )
             
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import build_elemental_dictionary as bed
+
+
+def scalar_score(sims_by_key):
+    """The original per-anchor loop: spirit and composition from plain floats"""
+    composition = {'earth': 0, 'air': 0, 'water': 0, 'fire': 0}
+    closest = ""
+    max_sim = 0
+    for key, sims in sims_by_key.items():
+        for sim in sims:
+            if max_sim < sim:
+                closest = key
+                max_sim = sim
+        if composition[key] < bed.log_scale(max_sim):
+            composition[key] = bed.log_scale(max_sim)
+    return closest, composition
+
+
+def check(anchor_dict, rng, dim=8, trials=200):
+    keys, starts = bed.anchor_layout(anchor_dict)
+    size = sum(len(v) for v in anchor_dict.values())
+    mat = rng.normal(size=(size, dim)).astype(np.float32)
+    mat /= np.linalg.norm(mat, axis=1, keepdims=True)
+    bed.ANCHOR_KEYS, bed.ANCHOR_STARTS = keys, starts
+    bed.get_anchor_matrix = lambda: mat
+    for _ in range(trials):
+        v = rng.normal(size=dim).astype(np.float32)
+        sims = bed.anchor_similarities(v)
+        sims_by_key = dict(zip(keys, np.split(sims, starts[1:]))) if keys else {}
+        closest, composition = scalar_score(sims_by_key)
+        entry = bed.score_synset("", v)
+        assert entry['spirit'] == closest, (anchor_dict, entry['spirit'], closest)
+        assert entry['composition'] == composition, (anchor_dict, entry['composition'], composition)
+
+
+rng = np.random.default_rng(0)
+cases = [
+    {'air': ['a', 'b'], 'water': ['c'], 'earth': ['d', 'e', 'f'], 'fire': ['g']},
+    {'air': ['a', 'b'], 'water': [], 'earth': ['c'], 'fire': ['d']},
+    {'air': ['a'], 'water': ['b'], 'earth': ['c'], 'fire': []},
+    {'air': [], 'water': [], 'earth': ['a', 'b'], 'fire': []},
+    {'air': [], 'water': [], 'earth': [], 'fire': []},
+]
+for case in cases:
+    check(case, rng)
+print(f"{len(cases)} anchor layouts match the scalar loop")